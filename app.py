@@ -1,15 +1,43 @@
-from flask import Flask, render_template, request, jsonify, send_from_directory
+from flask import Flask, render_template, request, jsonify, Response
+import functools
 import json
 import math
 import heapq
 import os
-from collections import defaultdict
+import numpy as np
+from collections import defaultdict, namedtuple
 from werkzeug.utils import secure_filename
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+try:
+    from flask_compress import Compress
+except ImportError:
+    Compress = None
+
 app = Flask(__name__)
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024
 
+# Instruction JSON is highly repetitive and compresses very well; level 5
+# balances CPU cost against ratio.
+if Compress is not None:
+    app.config['COMPRESS_LEVEL'] = 5
+    Compress(app)
+
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 ALLOWED_EXTENSIONS = {'geojson', 'json'}
 
@@ -17,26 +45,66 @@ def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 # GEO HELPERS
-def haversine(a, b):
+# The scalar helpers take the math functions as defaulted arguments so the
+# calls resolve via LOAD_FAST instead of LOAD_GLOBAL + LOAD_ATTR per hit.
+def haversine(a, b, _radians=math.radians, _sin=math.sin, _cos=math.cos,
+              _sqrt=math.sqrt, _asin=math.asin):
     lon1, lat1 = a
     lon2, lat2 = b
     R = 6371000
-    phi1 = math.radians(lat1)
-    phi2 = math.radians(lat2)
-    dphi = math.radians(lat2 - lat1)
-    dlambda = math.radians(lon2 - lon1)
-    x = math.sin(dphi/2)**2 + math.cos(phi1)*math.cos(phi2)*math.sin(dlambda/2)**2
-    return 2 * R * math.atan2(math.sqrt(x), math.sqrt(1-x))
-
-def bearing(a, b):
-    lon1, lat1 = map(math.radians, a)
-    lon2, lat2 = map(math.radians, b)
+    phi1 = _radians(lat1)
+    phi2 = _radians(lat2)
+    dphi = _radians(lat2 - lat1)
+    dlambda = _radians(lon2 - lon1)
+    x = _sin(dphi/2)**2 + _cos(phi1)*_cos(phi2)*_sin(dlambda/2)**2
+    # asin form saves a sqrt over atan2(sqrt(x), sqrt(1-x)); the clamp
+    # guards against x rounding slightly above 1.0.
+    return 2 * R * _asin(min(1.0, _sqrt(x)))
+
+def haversine_array(coords_np):
+    """Summed haversine length of an (N, 2) [lon, lat] polyline, one batched call."""
+    lon = np.radians(coords_np[:, 0])
+    lat = np.radians(coords_np[:, 1])
+    dphi = np.diff(lat)
+    dlam = np.diff(lon)
+    a = np.sin(dphi/2)**2 + np.cos(lat[:-1])*np.cos(lat[1:])*np.sin(dlam/2)**2
+    seg = 2 * 6371000 * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+    return float(seg.sum())
+
+def bearing(a, b, _radians=math.radians, _sin=math.sin, _cos=math.cos,
+            _atan2=math.atan2, _degrees=math.degrees):
+    lon1, lat1 = map(_radians, a)
+    lon2, lat2 = map(_radians, b)
     dlon = lon2 - lon1
-    x = math.sin(dlon) * math.cos(lat2)
-    y = math.cos(lat1)*math.sin(lat2) - math.sin(lat1)*math.cos(lat2)*math.cos(dlon)
-    brng = math.degrees(math.atan2(x, y))
+    x = _sin(dlon) * _cos(lat2)
+    y = _cos(lat1)*_sin(lat2) - _sin(lat1)*_cos(lat2)*_cos(dlon)
+    brng = _degrees(_atan2(x, y))
     return (brng + 360) % 360
 
+def haversine_and_bearing(a, b, _radians=math.radians, _sin=math.sin,
+                          _cos=math.cos, _sqrt=math.sqrt, _asin=math.asin,
+                          _atan2=math.atan2, _degrees=math.degrees):
+    """Distance and initial bearing for one point pair, sharing the trig intermediates."""
+    lon1, lat1 = a
+    lon2, lat2 = b
+    R = 6371000
+    phi1 = _radians(lat1)
+    phi2 = _radians(lat2)
+    dphi = _radians(lat2 - lat1)
+    dlambda = _radians(lon2 - lon1)
+    sphi1 = _sin(phi1)
+    cphi1 = _cos(phi1)
+    sphi2 = _sin(phi2)
+    cphi2 = _cos(phi2)
+    slam = _sin(dlambda)
+    clam = _cos(dlambda)
+    x = _sin(dphi/2)**2 + cphi1*cphi2*_sin(dlambda/2)**2
+    d = 2 * R * _asin(min(1.0, _sqrt(x)))
+    bx = slam * cphi2
+    by = cphi1*sphi2 - sphi1*cphi2*clam
+    brng = (_degrees(_atan2(bx, by)) + 360) % 360
+    return d, brng
+
 def turn_direction(b1, b2):
     diff = (b2 - b1 + 540) % 360 - 180
     if abs(diff) < 25:
@@ -46,56 +114,407 @@ def turn_direction(b1, b2):
     else:
         return "Turn left"
 
+# CSR adjacency plus side arrays, so Dijkstra runs over flat int/float
+# arrays instead of chasing dict-of-list-of-tuple pointers.
+#   indptr     : (V+1,) int64, edge range of node i is indptr[i]:indptr[i+1]
+#   neighbors  : (2E,) int64 target node ids
+#   weights    : (2E,) int32 edge lengths in millimeters (clamped to >= 1),
+#                so queue entries pack as (cost_mm << 32) | node_id in one
+#                int64 and compare as plain integers
+#   edge_index : (2E,) int64 index into edges
+#   edges      : per directed edge (geom_spec, dist, start_bearing, end_bearing)
+#                where geom_spec = (lo, hi, direction) slices geom_arena
+#   geom_arena : (N, 2) float32 lon/lat of every polyline, back to back;
+#                reverse edges share the forward rows via direction == -1
+#   min_w/max_w : smallest and largest edge length in millimeters, for the
+#                 bucket-queue Dijkstra (0 when there are no edges)
+CSRGraph = namedtuple("CSRGraph", [
+    "indptr", "neighbors", "weights", "edge_index", "edges",
+    "node_names", "name_to_id", "node_lon", "node_lat",
+    "min_w", "max_w", "geom_arena",
+])
+
+def edge_coords(graph, rec):
+    """Materialize an edge record's polyline as a view into the arena."""
+    lo, hi, direction = rec[0]
+    view = graph.geom_arena[lo:hi]
+    return view if direction == 1 else view[::-1]
+
+def _iter_features(file_path):
+    """Yield GeoJSON features one at a time.
+
+    With ijson this streams the file without materializing the whole
+    document, halving peak memory on large uploads; otherwise it falls
+    back to a full orjson/json parse.
+    """
+    if ijson is not None:
+        with open(file_path, "rb") as f:
+            yield from ijson.items(f, "features.item", use_float=True)
+        return
+    with open(file_path, "rb") as f:
+        raw = f.read()
+    data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+    yield from data["features"]
+
 def build_graph(file_path):
-    with open(file_path) as f:
-        data = json.load(f)
-    graph = defaultdict(list)
+    adj = defaultdict(list)
     nodes = {}
-    for feat in data["features"]:
-        if feat["geometry"]["type"] == "Point":
+    all_coords = []
+    # Single pass: LineStrings only need their own coords, not the node
+    # dict, so Points and edges can be consumed in whatever order they
+    # stream in.
+    for feat in _iter_features(file_path):
+        gtype = feat["geometry"]["type"]
+        if gtype == "Point":
             name = feat["properties"]["name"].lower()
             coord = tuple(feat["geometry"]["coordinates"])
             nodes[name] = coord
-    for feat in data["features"]:
-        if feat["geometry"]["type"] == "LineString":
-            name = feat["properties"]["name"].lower()
-            if "-" not in name:
-                continue
-            a, b = name.split("-")
-            coords = [tuple(c) for c in feat["geometry"]["coordinates"]]
-            dist = 0
-            for i in range(len(coords)-1):
-                dist += haversine(coords[i], coords[i+1])
-            graph[a].append((b, dist, coords))
-            graph[b].append((a, dist, coords[::-1]))
+            continue
+        if gtype != "LineString":
+            continue
+        name = feat["properties"]["name"].lower()
+        if "-" not in name:
+            continue
+        a, b = name.split("-")
+        coords = [tuple(c) for c in feat["geometry"]["coordinates"]]
+        coords_np = np.asarray(feat["geometry"]["coordinates"], dtype=np.float64)
+        dist = haversine_array(coords_np)
+        # Bearings are pure functions of the static geometry, so compute
+        # them once here instead of per route request.
+        start_bearing = bearing(coords[0], coords[1])
+        end_bearing = bearing(coords[-2], coords[-1])
+        lo = len(all_coords)
+        all_coords.extend(coords)
+        hi = len(all_coords)
+        adj[a].append((b, dist, (lo, hi, 1), start_bearing, end_bearing))
+        adj[b].append((a, dist, (lo, hi, -1),
+                       (end_bearing + 180) % 360, (start_bearing + 180) % 360))
+    geom_arena = np.asarray(all_coords, dtype=np.float32).reshape(-1, 2)
+    graph = _to_csr(adj, nodes, geom_arena)
     return graph, nodes
 
-def shortest_path(graph, start, end):
-    pq = [(0, start, [], [])]
-    visited = set()
-    while pq:
-        cost, node, path, geoms = heapq.heappop(pq)
-        if node in visited:
+def _to_csr(adj, nodes, geom_arena):
+    node_names = sorted(set(adj) | set(nodes))
+    name_to_id = {n: i for i, n in enumerate(node_names)}
+    indptr = [0]
+    neighbors = []
+    weights = []
+    edge_index = []
+    edges = []
+    for name in node_names:
+        for nb, d, geom_spec, sb, eb in adj.get(name, ()):
+            neighbors.append(name_to_id[nb])
+            # Fixed-point millimeters; clamp so no edge is free, which also
+            # keeps the bucket queue's strictly-later-bucket invariant.
+            weights.append(max(1, int(round(d * 1000))))
+            edge_index.append(len(edges))
+            edges.append((geom_spec, d, sb, eb))
+        indptr.append(len(neighbors))
+    node_lon = np.array([nodes.get(n, (math.nan, math.nan))[0] for n in node_names])
+    node_lat = np.array([nodes.get(n, (math.nan, math.nan))[1] for n in node_names])
+    min_w = min(weights) if weights else 0
+    max_w = max(weights) if weights else 0
+    return CSRGraph(
+        indptr=np.asarray(indptr, dtype=np.int64),
+        neighbors=np.asarray(neighbors, dtype=np.int64),
+        weights=np.asarray(weights, dtype=np.int32),
+        edge_index=np.asarray(edge_index, dtype=np.int64),
+        # The graph is never mutated after construction; freeze the record
+        # list so the cached structure is read-only all the way down.
+        edges=tuple(edges),
+        node_names=node_names,
+        name_to_id=name_to_id,
+        node_lon=node_lon,
+        node_lat=node_lat,
+        min_w=min_w,
+        max_w=max_w,
+        geom_arena=geom_arena,
+    )
+
+# Cache of built graphs keyed by file path: (graph, nodes, mtime).
+# Rebuilt only when the file on disk changes (e.g. re-upload).
+_GRAPH_CACHE = {}
+
+def _open_graph(filename):
+    """Resolve an uploaded filename to its cached graph.
+
+    Shared by the landmark and route endpoints: sanitizes the name, does a
+    single os.stat for both the existence check and cache invalidation,
+    and rebuilds only when the file on disk changed. Returns
+    (graph, nodes, mtime_ns, None) on success or
+    (None, None, None, error_response).
+    """
+    filepath = os.path.join(app.config['UPLOAD_FOLDER'], secure_filename(filename))
+    try:
+        mtime_ns = os.stat(filepath).st_mtime_ns
+    except OSError:
+        return None, None, None, (jsonify({"error": "GeoJSON file not found"}), 404)
+    cached = _GRAPH_CACHE.get(filepath)
+    if cached is not None and cached[2] == mtime_ns:
+        return cached[0], cached[1], mtime_ns, None
+    graph, nodes = build_graph(filepath)
+    _GRAPH_CACHE[filepath] = (graph, nodes, mtime_ns)
+    return graph, nodes, mtime_ns, None
+
+# Unreachable sentinel for int64 millimeter distances; far above any real
+# path cost but safe to add an edge weight to without overflow.
+_INF_MM = np.int64(1) << 62
+
+def _dijkstra_csr(indptr, neighbors, weights, src, dst, V):
+    """Dijkstra over CSR arrays with an inline binary heap.
+
+    Written against typed arrays only so Numba can compile it in nopython
+    mode; the same body runs under CPython when Numba is unavailable.
+    Distances are int64 millimeters; each heap entry packs
+    (cost_mm << 32) | node_id into one int64, so the heap is a single
+    array and entries compare as plain integers (cost in the high bits).
+    Returns (dist, prev, prev_slot, found) where prev_slot[v] is the CSR
+    slot of the edge used to reach v.
+    """
+    dist = np.full(V, _INF_MM, dtype=np.int64)
+    prev = np.full(V, -1, dtype=np.int64)
+    prev_slot = np.full(V, -1, dtype=np.int64)
+    # At most one push per relaxed directed edge, plus the source.
+    cap = neighbors.shape[0] + 1
+    heap = np.empty(cap, dtype=np.int64)
+    heap[0] = src  # cost 0 in the high bits
+    n = 1
+    dist[src] = 0
+    found = False
+    while n > 0:
+        entry = heap[0]
+        cost = entry >> 32
+        u = entry & 0xFFFFFFFF
+        n -= 1
+        heap[0] = heap[n]
+        i = 0
+        while True:  # sift down
+            c = 2*i + 1
+            if c >= n:
+                break
+            if c + 1 < n and heap[c+1] < heap[c]:
+                c += 1
+            if heap[c] < heap[i]:
+                heap[i], heap[c] = heap[c], heap[i]
+                i = c
+            else:
+                break
+        if cost > dist[u]:  # stale entry, lazy deletion
+            continue
+        if u == dst:
+            found = True
+            break
+        for k in range(indptr[u], indptr[u+1]):
+            v = neighbors[k]
+            nd = cost + weights[k]
+            if nd < dist[v]:
+                dist[v] = nd
+                prev[v] = u
+                prev_slot[v] = k
+                i = n
+                heap[i] = (nd << 32) | v
+                n += 1
+                while i > 0:  # sift up
+                    p = (i - 1) // 2
+                    if heap[i] < heap[p]:
+                        heap[i], heap[p] = heap[p], heap[i]
+                        i = p
+                    else:
+                        break
+    return dist, prev, prev_slot, found
+
+if njit is not None:
+    _dijkstra_csr = njit(cache=True)(_dijkstra_csr)
+
+# Refuse to allocate absurd bucket counts (degenerate weight ratios); the
+# binary-heap kernel handles those graphs instead.
+_MAX_BUCKETS = 1 << 20
+
+def _dijkstra_buckets(graph, src, dst, V):
+    """Dial-style bucket-queue Dijkstra over the CSR arrays.
+
+    Edge lengths are physical meters with a bounded max/min ratio, so a
+    bucket of width min_w gives O(1) amortized push/pop in place of the
+    heap's O(log n). Every relaxation lands in a strictly later bucket
+    (w >= min_w), so the scan never revisits a drained bucket.
+    """
+    indptr = graph.indptr
+    neighbors = graph.neighbors
+    weights = graph.weights
+    delta = graph.min_w
+    dist = np.full(V, _INF_MM, dtype=np.int64)
+    prev = np.full(V, -1, dtype=np.int64)
+    prev_slot = np.full(V, -1, dtype=np.int64)
+    # Any tentative distance is at most the total undirected edge length
+    # (weights holds both directions) plus one more edge.
+    max_dist = int(weights.sum()) // 2 + graph.max_w
+    nb = max_dist // delta + 2
+    buckets = [[] for _ in range(nb)]
+    buckets[0].append(src)  # cost 0 in the high bits
+    dist[src] = 0
+    found = False
+    for cur in range(nb):
+        for entry in buckets[cur]:
+            cost = entry >> 32
+            u = entry & 0xFFFFFFFF
+            if cost > dist[u]:  # stale entry, lazy deletion
+                continue
+            if u == dst:
+                found = True
+                break
+            for k in range(indptr[u], indptr[u+1]):
+                v = neighbors[k]
+                nd = cost + weights[k]
+                if nd < dist[v]:
+                    dist[v] = nd
+                    prev[v] = u
+                    prev_slot[v] = k
+                    buckets[nd // delta].append((int(nd) << 32) | int(v))
+        if found:
+            break
+    return dist, prev, prev_slot, found
+
+def _use_buckets(graph):
+    if njit is not None or graph.min_w <= 0:
+        return False
+    total = int(graph.weights.sum()) // 2 + graph.max_w
+    return total // graph.min_w + 2 <= _MAX_BUCKETS
+
+# Minimum node count before the bidirectional search pays for its two-heap
+# bookkeeping; below this the plain kernel wins.
+_BIDIR_MIN_NODES = 500
+
+def _reverse_edge_record(rec):
+    (lo, hi, direction), d, sb, eb = rec
+    return ((lo, hi, -direction), d, (eb + 180) % 360, (sb + 180) % 360)
+
+def _bidirectional_search(graph, src, dst, V):
+    """Meet-in-the-middle Dijkstra from both endpoints.
+
+    The graph is undirected, so the same CSR arrays serve as their own
+    reverse view. Stops once the frontier keys prove no shorter meeting
+    point exists (top_f + top_b >= mu).
+    """
+    indptr = graph.indptr
+    neighbors = graph.neighbors
+    weights = graph.weights
+    dist_f = np.full(V, _INF_MM, dtype=np.int64)
+    dist_b = np.full(V, _INF_MM, dtype=np.int64)
+    prev_f = np.full(V, -1, dtype=np.int64)
+    prev_b = np.full(V, -1, dtype=np.int64)
+    slot_f = np.full(V, -1, dtype=np.int64)
+    slot_b = np.full(V, -1, dtype=np.int64)
+    dist_f[src] = 0
+    dist_b[dst] = 0
+    pq_f = [src]  # packed (cost_mm << 32) | node entries, cost 0 here
+    pq_b = [dst]
+    mu = _INF_MM
+    meet = -1
+    while pq_f and pq_b:
+        if (pq_f[0] >> 32) + (pq_b[0] >> 32) >= mu:
+            break
+        forward = (pq_f[0] >> 32) <= (pq_b[0] >> 32)
+        if forward:
+            pq, dist, other, prev, slot = pq_f, dist_f, dist_b, prev_f, slot_f
+        else:
+            pq, dist, other, prev, slot = pq_b, dist_b, dist_f, prev_b, slot_b
+        entry = heapq.heappop(pq)
+        cost = entry >> 32
+        u = entry & 0xFFFFFFFF
+        if cost > dist[u]:
             continue
-        path = path + [node]
-        if node == end:
-            return path, geoms
-        visited.add(node)
-        for nxt, w, coords in graph[node]:
-            heapq.heappush(pq, (cost+w, nxt, path, geoms+[coords]))
-    return None, None
+        for k in range(indptr[u], indptr[u+1]):
+            v = neighbors[k]
+            nd = cost + weights[k]
+            if nd < dist[v]:
+                dist[v] = nd
+                prev[v] = u
+                slot[v] = k
+                heapq.heappush(pq, (int(nd) << 32) | int(v))
+            if other[v] < _INF_MM and dist[v] + other[v] < mu:
+                mu = dist[v] + other[v]
+                meet = int(v)
+    if meet < 0:
+        return None, None
+    edges = graph.edges
+    edge_index = graph.edge_index
+    node_names = graph.node_names
+    path = []
+    geoms = []
+    u = meet
+    while u != src:
+        path.append(node_names[u])
+        geoms.append(edges[edge_index[slot_f[u]]])
+        u = int(prev_f[u])
+    path.append(node_names[src])
+    path.reverse()
+    geoms.reverse()
+    u = meet
+    while u != dst:
+        # Backward-side slots are oriented away from dst; flip them into
+        # travel direction, same as build_graph does for reverse edges.
+        geoms.append(_reverse_edge_record(edges[edge_index[slot_b[u]]]))
+        u = int(prev_b[u])
+        path.append(node_names[u])
+    return path, geoms
+
+def shortest_path(graph, start, end):
+    name_to_id = graph.name_to_id
+    if start not in name_to_id or end not in name_to_id:
+        return None, None
+    src = name_to_id[start]
+    dst = name_to_id[end]
+    if src == dst:
+        return [start], []
+    V = len(graph.node_names)
+    if V > _BIDIR_MIN_NODES:
+        return _bidirectional_search(graph, src, dst, V)
+    if _use_buckets(graph):
+        dist, prev, prev_slot, found = _dijkstra_buckets(graph, src, dst, V)
+    else:
+        dist, prev, prev_slot, found = _dijkstra_csr(
+            graph.indptr, graph.neighbors, graph.weights, src, dst, V)
+    if not found:
+        return None, None
+    path = []
+    geoms = []
+    u = dst
+    while u != src:
+        path.append(graph.node_names[u])
+        geoms.append(graph.edges[graph.edge_index[prev_slot[u]]])
+        u = int(prev[u])
+    path.append(start)
+    path.reverse()
+    geoms.reverse()
+    return path, geoms
+
+def _turn_labels(geoms):
+    """Classify every transition in one vectorized pass.
+
+    Bearings were precomputed at build time, so the remaining per-step
+    work is just the signed angle difference; batching it keeps the
+    instruction loop free of arithmetic entirely.
+    """
+    if len(geoms) < 2:
+        return []
+    b_prev = np.array([g[3] for g in geoms[:-1]])
+    b_next = np.array([g[2] for g in geoms[1:]])
+    diff = (b_next - b_prev + 540) % 360 - 180
+    labels = np.where(np.abs(diff) < 25, "Go straight",
+                      np.where(diff > 0, "Turn right", "Turn left"))
+    return labels.tolist()
 
 def generate_instructions(path, geoms):
     instructions = []
     instructions.append({"text": f"Start at {path[0].capitalize()}", "type": "start"})
-    
-    prev_coords = None
+
+    turns = _turn_labels(geoms)
+
     for i in range(len(geoms)):
-        coords = geoms[i]
-        dist = 0
-        for j in range(len(coords)-1):
-            dist += haversine(coords[j], coords[j+1])
-        
+        # Distance and bearings were precomputed in build_graph; this loop
+        # is pure string formatting and never touches the geometry arena.
+        geom_spec, dist, start_bearing, end_bearing = geoms[i]
+
         next_node = path[i+1] 
         is_junction = next_node.startswith("j")
         
@@ -115,9 +534,7 @@ def generate_instructions(path, geoms):
                     "landmark": next_node
                 })
         else:
-            b1 = bearing(prev_coords[-2], prev_coords[-1])
-            b2 = bearing(coords[0], coords[1])
-            turn = turn_direction(b1, b2)
+            turn = turns[i-1]
             
             current_node = path[i]
             current_is_junction = current_node.startswith("j")
@@ -177,11 +594,32 @@ def generate_instructions(path, geoms):
                             "landmark": next_node
                         })
         
-        prev_coords = coords
-    
     instructions.append({"text": f"Reach {path[-1].upper()}", "type": "destination"})
     return instructions
 
+@functools.lru_cache(maxsize=1024)
+def _compute_route(filename, mtime_ns, start, end):
+    """Memoized route computation, keyed by (filename, mtime_ns, start, end).
+
+    mtime_ns in the key auto-invalidates entries when the GeoJSON is
+    re-uploaded. Returns the serialized JSON body so repeat requests also
+    skip re-serialization, or None when no route exists.
+    """
+    graph, nodes, _, error = _open_graph(filename)
+    if error is not None:
+        return None
+    path, geoms = shortest_path(graph, start, end)
+    if not path:
+        return None
+    instructions = generate_instructions(path, geoms)
+    payload = {
+        "route": " -> ".join(path),
+        "instructions": instructions,
+        "total_steps": len(instructions),
+        "filename": filename,
+    }
+    return orjson.dumps(payload) if orjson is not None else json.dumps(payload)
+
 # Routes
 @app.route('/')
 def index():
@@ -206,10 +644,9 @@ def upload_file():
 @app.route('/api/landmarks/<filename>')
 def get_landmarks(filename):
     try:
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        if not os.path.exists(filepath):
-            return jsonify({"error": "File not found"}), 404
-        graph, nodes = build_graph(filepath)
+        graph, nodes, mtime_ns, error = _open_graph(filename)
+        if error is not None:
+            return error
         return jsonify(list(nodes.keys()))
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -221,34 +658,24 @@ def get_route(filename):
         start = data['start'].lower()
         end = data['end'].lower()
         
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        if not os.path.exists(filepath):
-            return jsonify({"error": "GeoJSON file not found"}), 404
-        
-        graph, nodes = build_graph(filepath)
-        
+        graph, nodes, mtime_ns, error = _open_graph(filename)
+        if error is not None:
+            return error
+
         if start not in nodes or end not in nodes:
             return jsonify({"error": f"Landmark not found: {start} or {end}"}), 400
-        
-        path, geoms = shortest_path(graph, start, end)
-        
-        if not path:
+
+        body = _compute_route(filename, mtime_ns, start, end)
+
+        if body is None:
             return jsonify({"error": "No route found"}), 404
-        
-        instructions = generate_instructions(path, geoms)
-        
-        return jsonify({
-            "route": " -> ".join(path),
-            "instructions": instructions,
-            "total_steps": len(instructions),
-            "filename": filename
-        })
+
+        return Response(body, mimetype='application/json')
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-@app.route('/static/<path:filename>')
-def static_files(filename):
-    return send_from_directory('static', filename)
-
+# Development only. In production run the app under gunicorn (see Procfile),
+# which handles requests concurrently instead of serializing them through
+# Werkzeug's single-threaded debug server.
 if __name__ == '__main__':
     app.run(debug=True, port=5000)